@@ -2,8 +2,17 @@
 Abstract base class for metadata collectors.
 """
 
+import asyncio
 import logging
+import os
 from abc import ABC, abstractmethod
+from typing import Dict, MutableMapping, Optional
+from cachetools import TTLCache
+
+
+# Successful lookups are cached in-process to spare the rate-limited upstream APIs
+CACHE_TTL = int(os.getenv("METADATA_CACHE_TTL", "86400"))  # Seconds
+CACHE_SIZE = int(os.getenv("METADATA_CACHE_SIZE", "2048"))  # Entries
 
 
 class MetadataCollector(ABC):
@@ -14,14 +23,19 @@ class MetadataCollector(ABC):
     The metadata is returned as a dictionary.
     """
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, cache: Optional[MutableMapping] = None):
         self.name = name
+        self.cache = (
+            cache if cache is not None else TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+        )
 
-        logging.basicConfig(level=logging.DEBUG)
+        # Logging is configured once by the application entrypoint
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.logger.setLevel(logging.DEBUG)
         self.logger.info("Initializing %s", self.__class__.__name__)
 
+        # Lookups currently in progress, so concurrent identical queries share one
+        self._inflight: Dict[str, asyncio.Task] = {}
+
     def get_name(self) -> str:
         """
         Get the name or identifier of the metadata collector.
@@ -31,6 +45,37 @@ class MetadataCollector(ABC):
         """
         return self.name
 
+    def cache_key(self, kind: str, *parts: str) -> str:
+        """
+        Build a normalized cache key for a lookup.
+
+        Parameters:
+        - kind (str): The kind of lookup, e.g. "artist" or "album".
+        - parts (str): The lookup arguments.
+
+        Returns:
+        - str: The cache key.
+
+        Example:
+        - cache_key("album", "The  Beatles ", "Abbey Road")
+            -> "discogs:album:the beatles:abbey road"
+        """
+        # Collapse runs of whitespace and casefold so trivially different queries match
+        return ":".join(
+            [self.name, kind, *(" ".join(part.split()).casefold() for part in parts)]
+        )
+
+    def cache_result(self, key: str, result: dict) -> None:
+        """
+        Store a lookup result in the cache. Errors and empty results are not cached.
+
+        Parameters:
+        - key (str): The cache key, as returned by cache_key().
+        - result (dict): The lookup result.
+        """
+        if result and "error" not in result:
+            self.cache[key] = result
+
     @abstractmethod
     async def fetch_artist_details(self, artist_name: str) -> dict:
         """
@@ -100,30 +145,65 @@ class MetadataCollector(ABC):
         self.logger.info("Fetching metadata for query: '%s'", query)
 
         # Parse the query
-        try:
-            artist_name, album_name = query.split(" - ", 1)
-            artist_name = artist_name.strip()
-            album_name = album_name.strip()
-            self.logger.debug(
-                "Parsed query into artist: '%s', album: '%s'", artist_name, album_name
-            )
-        except ValueError:
+        artist_name, separator, album_name = query.partition(" - ")
+        if not separator:
             error_message = (
                 "Invalid query format. Expected format: '{artist name} - {album name}'"
             )
             self.logger.error("%s Query: '%s'", error_message, query)
             return {"error": error_message}
+        artist_name = artist_name.strip()
+        album_name = album_name.strip()
+        self.logger.debug(
+            "Parsed query into artist: '%s', album: '%s'", artist_name, album_name
+        )
+
+        # Coalesce concurrent identical queries into a single upstream lookup
+        key = self.cache_key("metadata", artist_name, album_name)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_details(artist_name, album_name))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.logger.debug("Joining in-flight lookup for query: '%s'", query)
+
+        # Shield the shared task so one cancelled caller doesn't cancel the others
+        metadata = await asyncio.shield(task)
+        if "error" not in metadata:
+            self.logger.info("Successfully fetched metadata for query: '%s'", query)
+        return metadata
 
-        # Fetch artist details
-        artist_details = await self.fetch_artist_details(artist_name)
+    async def _fetch_details(self, artist_name: str, album_name: str) -> dict:
+        """
+        Fetch and compile artist and album details for a parsed query.
+
+        Parameters:
+        - artist_name (str): The name of the artist.
+        - album_name (str): The name of the album.
+
+        Returns:
+        - dict: The compiled metadata, or a dictionary with an "error" key.
+        """
+        # Fetch artist and album details concurrently, since neither depends on the other
+        artist_details, album_details = await asyncio.gather(
+            self.fetch_artist_details(artist_name),
+            self.fetch_album_details(artist_name, album_name),
+            return_exceptions=True,
+        )
+
+        if isinstance(artist_details, Exception):
+            self.logger.error("Error fetching artist details: %s", artist_details)
+            return {"error": str(artist_details)}
         if "error" in artist_details:
             self.logger.error(
                 "Error fetching artist details: %s", artist_details["error"]
             )
             return {"error": artist_details["error"]}
 
-        # Fetch album details
-        album_details = await self.fetch_album_details(artist_name, album_name)
+        if isinstance(album_details, Exception):
+            self.logger.error("Error fetching album details: %s", album_details)
+            return {"error": str(album_details)}
         if "error" in album_details:
             self.logger.error(
                 "Error fetching album details: %s", album_details["error"]
@@ -136,5 +216,4 @@ class MetadataCollector(ABC):
             "album": album_details,
         }
 
-        self.logger.info("Successfully fetched metadata for query: '%s'", query)
         return metadata
@@ -2,16 +2,56 @@
 Fetch metadata from the Discogs API.
 """
 
+import asyncio
 import os
 import re
+import threading
+from typing import Optional
 from dotenv import load_dotenv
+import requests
 import discogs_client  # https://github.com/joalla/discogs_client
+from discogs_client.fetchers import UserTokenRequestsFetcher
+from discogs_client.utils import backoff
 from app.collectors.base import MetadataCollector
 
 
 load_dotenv()
 USER_AGENT = os.getenv("DISCOGS_USER_AGENT")
 TOKEN = os.getenv("DISCOGS_TOKEN")
+# Maximum number of Discogs requests in flight at once
+MAX_CONCURRENCY = int(os.getenv("DISCOGS_MAX_CONCURRENCY", "8"))
+# Release format names (casefolded) that count as a CD release
+CD_FORMATS = frozenset({"cd"})
+
+# Discogs markup handled by discogs_to_html, matched in a single pass at import
+_MARKUP_RE = re.compile(
+    r"(?P<url>\[url=(?P<url_href>[^\]]+)\](?P<url_text>.*?)\[/url\])"
+    r"|(?P<link>\[(?P<link_type>[ar])=(?P<link_id>[^\]]+)\])"
+    r"|(?P<section>^(?:Band members:|Current live members:|Former members:|Previous names:))",
+    re.MULTILINE,
+)
+
+# Discogs site paths for [a=...] (artist) and [r=...] (release) tags
+_LINK_PATHS = {"a": "artist", "r": "release"}
+
+# Track durations, "MM:SS" with an optional leading hours field
+_DURATION_RE = re.compile(r"(?:(\d+):)?(\d+):(\d+)")
+
+
+def _replace_markup(match: re.Match) -> str:
+    """
+    Render a single Discogs markup match as HTML. Used as the _MARKUP_RE callback.
+    """
+    kind = match.lastgroup
+    if kind == "url":
+        # Link text may itself contain [a=...]/[r=...] tags
+        text = _MARKUP_RE.sub(_replace_markup, match.group("url_text"))
+        return f'<a href="{match.group("url_href")}">{text}</a>'
+    if kind == "link":
+        path = _LINK_PATHS[match.group("link_type")]
+        link_id = match.group("link_id")
+        return f'<a href="https://www.discogs.com/{path}/{link_id}">{link_id}</a>'
+    return f"<strong>{match.group('section')}</strong>"
 
 
 def discogs_to_html(text: str) -> str:
@@ -30,29 +70,100 @@ def discogs_to_html(text: str) -> str:
     """
     text = text.replace("\r\n", "<br>")  # Newlines
 
-    # Convert [url=...]...[/url] to <a href="...">...</a>
-    text = re.sub(r"\[url=([^\]]+)\](.*?)\[/url\]", r'<a href="\1">\2</a>', text)
+    # Convert [url=...], [a=...] and [r=...] to links and bold section headers
+    text = _MARKUP_RE.sub(_replace_markup, text)
+
+    text = text.replace("–", "-")  # Standardize hyphens
+    return text
+
 
-    # Convert [a=...] to <a href="https://www.discogs.com/artist/...">...</a>
-    text = re.sub(
-        r"\[a=([^\]]+)\]", r'<a href="https://www.discogs.com/artist/\1">\1</a>', text
-    )
+def parse_year(year) -> Optional[int]:
+    """
+    Parse a Discogs release year.
 
-    # Convert [r=...] to <a href="https://www.discogs.com/release/...">...</a>
-    text = re.sub(
-        r"\[r=([^\]]+)\]", r'<a href="https://www.discogs.com/release/\1">\1</a>', text
-    )
+    Parameters:
+    - year: The year as returned by Discogs (int, str or None).
 
-    # Bold sections like "Band members:"
-    text = re.sub(
-        r"^(Band members:|Current live members:|Former members:|Previous names:)",
-        r"<strong>\1</strong>",
-        text,
-        flags=re.MULTILINE,
-    )
+    Returns:
+    - int: The year, or None if it is missing, invalid or 0.
+
+    Example:
+    - parse_year("1969") -> 1969
+    - parse_year("0") -> None
+    """
+    try:
+        year = int(year)
+    except (TypeError, ValueError):
+        return None
+    return year if year > 0 else None
+
+
+def is_cd_release(release) -> bool:
+    """
+    Check whether a Discogs release is a CD.
+
+    Search results carry the release formats inline, so prefer those over
+    release.formats, which would fetch the full release over HTTP.
+
+    Parameters:
+    - release (discogs_client.models.Release): The release to check.
+
+    Returns:
+    - bool: True if any of the release's formats is in CD_FORMATS, False otherwise.
+    """
+    data = release.data
+    if "formats" in data:
+        names = [fmt["name"] for fmt in data["formats"]]
+    elif "format" in data:
+        names = data["format"]  # Search results list format names as strings
+    else:
+        names = [fmt["name"] for fmt in release.formats]
+    return any(name.casefold() in CD_FORMATS for name in names)
 
-    text = text.replace("–", "-")  # Standardize hyphens
-    return text
+
+def parse_duration(duration) -> Optional[int]:
+    """
+    Parse a Discogs track duration into seconds.
+
+    Parameters:
+    - duration (str): The duration as returned by Discogs, "MM:SS" or "H:MM:SS".
+
+    Returns:
+    - int: The duration in seconds, or None if it is missing or invalid.
+
+    Example:
+    - parse_duration("4:20") -> 260
+    - parse_duration("") -> None
+    """
+    match = _DURATION_RE.fullmatch(duration.strip()) if duration else None
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return (int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)
+
+
+class SessionFetcher(UserTokenRequestsFetcher):
+    """
+    User-token fetcher that sends every request through one requests.Session.
+
+    The stock fetcher opens a new connection (and TLS handshake) per call; sharing a
+    session keeps connections to api.discogs.com alive between calls.
+    """
+
+    def __init__(self, user_token: str):
+        super().__init__(user_token)
+        self.session = requests.Session()
+
+    @backoff
+    def request(self, method, url, data, headers, params=None):
+        return self.session.request(
+            method=method,
+            url=url,
+            data=data,
+            headers=headers,
+            params=params,
+            timeout=(self.connect_timeout, self.read_timeout),
+        )
 
 
 class DiscogsCollector(MetadataCollector):
@@ -71,12 +182,26 @@ class DiscogsCollector(MetadataCollector):
     https://www.discogs.com/developers/
     """
 
+    # Shared by all instances, since the rate limit applies per source IP
+    _client = None
+    _client_lock = threading.Lock()
+    # Cap in-flight requests so bursts don't trip the server-side rate limit
+    _semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
     def __init__(self, name: str):
         super().__init__(name)
         self.logger.info("Initializing DiscogsCollector")
 
-        self.client = discogs_client.Client(USER_AGENT, user_token=TOKEN)
-        self.logger.info("Discogs client initialized")
+        with DiscogsCollector._client_lock:
+            if DiscogsCollector._client is None:
+                DiscogsCollector._client = discogs_client.Client(
+                    USER_AGENT, user_token=TOKEN
+                )
+                if TOKEN:
+                    # Reuse pooled connections across requests
+                    DiscogsCollector._client._fetcher = SessionFetcher(TOKEN)
+                self.logger.info("Discogs client initialized")
+        self.client = DiscogsCollector._client
 
     async def fetch_artist_details(self, artist_name: str) -> dict:
         """
@@ -107,32 +232,55 @@ class DiscogsCollector(MetadataCollector):
         """
         self.logger.info("Fetching Discogs details for artist: %s", artist_name)
 
+        key = self.cache_key("artist", artist_name)
+        if (cached := self.cache.get(key)) is not None:
+            self.logger.debug("Cache hit for %s", key)
+            return cached
+
+        # discogs_client is blocking, so run it in a worker thread
+        async with self._semaphore:
+            artist_details = await asyncio.to_thread(
+                self._fetch_artist_sync, artist_name
+            )
+        self.cache_result(key, artist_details)
+        return artist_details
+
+    def _fetch_artist_sync(self, artist_name: str) -> dict:
+        """
+        Blocking implementation of fetch_artist_details.
+
+        discogs_client fetches model attributes lazily over HTTP, so every attribute
+        access must happen here rather than on the event loop.
+        """
         try:
             results = self.client.search(artist_name, type="artist")
+            artists = results.page(1)
         except discogs_client.exceptions.HTTPError as e:
             error_message = f"An error occurred: {str(e)}"
             self.logger.error(error_message)
             return {"error": error_message}
-        artists = results.page(1)
 
         if not artists:
             self.logger.warning("No artist found for name: %s", artist_name)
             return {}
 
+        # Hydrate the artist with a single GET, then read each field from its raw data
+        # exactly once
         artist = artists[0]
+        artist.refresh()
+        data = artist.data
         # TODO: ensure this is an artist?
+        name_variations = data.get("namevariations")
+        images = data.get("images")
+        profile = data.get("profile")
         artist_details = {
-            "name": artist.name,
-            "namevariations": (
-                artist.name_variations if artist.name_variations else None
-            ),
+            "name": data.get("name"),
+            "namevariations": name_variations or None,
             "genres": None,  # Discogs does not provide genres
-            "image": (
-                artist.images[0]["uri"] if artist.images else None
-            ),  # Primary image
-            "url": artist.url,
+            "image": images[0]["uri"] if images else None,  # Primary image
+            "url": data.get("uri"),
             "popularity": None,  # Discogs does not provide popularity
-            "profile": artist.profile if artist.profile else None,
+            "profile": profile or None,
         }
         # Convert profile to HTML if available
         if artist_details["profile"]:
@@ -157,17 +305,12 @@ class DiscogsCollector(MetadataCollector):
         - find_release_date([<Release year=2000>, <Release year=1999>])
             -> "1999-01"
         """
-        release_dates = []
+        earliest = None
         for release in releases:
-            release_date = release.year
-            if release_date != "0" and release_date is not None:
-                release_date = str(release_date) + "-01"
-                release_dates.append(release_date)
-        if release_dates:
-            # Delete all `0-01` entries
-            release_dates = [date for date in release_dates if date != "0-01"]
-            return min(release_dates)
-        return None
+            year = parse_year(release.data.get("year"))
+            if year is not None and (earliest is None or year < earliest):
+                earliest = year
+        return f"{earliest:04d}-01" if earliest is not None else None
 
     async def fetch_album_details(self, artist_name: str, album_name: str) -> dict:
         """
@@ -205,13 +348,34 @@ class DiscogsCollector(MetadataCollector):
             "Fetching Discogs album: '%s' by artist: '%s'", album_name, artist_name
         )
 
+        key = self.cache_key("album", artist_name, album_name)
+        if (cached := self.cache.get(key)) is not None:
+            self.logger.debug("Cache hit for %s", key)
+            return cached
+
+        # discogs_client is blocking, so run it in a worker thread
+        async with self._semaphore:
+            album_details = await asyncio.to_thread(
+                self._fetch_album_sync, artist_name, album_name
+            )
+        self.cache_result(key, album_details)
+        return album_details
+
+    def _fetch_album_sync(self, artist_name: str, album_name: str) -> dict:
+        """
+        Blocking implementation of fetch_album_details.
+
+        discogs_client fetches model attributes lazily over HTTP, so every attribute
+        access (formats, images, tracklist, ...) must happen here rather than on the
+        event loop.
+        """
         try:
             results = self.client.search(album_name, type="release", artist=artist_name)
+            releases = results.page(1)
         except discogs_client.exceptions.HTTPError as e:
             error_message = f"An error occurred: {str(e)}"
             self.logger.error(error_message)
             return {"error": error_message}
-        releases = results.page(1)
 
         if not releases:
             self.logger.warning(
@@ -219,80 +383,71 @@ class DiscogsCollector(MetadataCollector):
             )
             return {}
 
-        # Filter releases to find the first CD release
-        cd_releases = [
-            release
-            for release in releases
-            if any(fmt["name"].lower() == "cd" for fmt in release.formats)
-        ]
-
-        if not cd_releases:
+        # Find the earliest CD release in a single pass, parsing each year only once
+        # Releases with an invalid or missing year sort last
+        first_cd_release = None
+        earliest = None
+        for candidate in releases:
+            if not is_cd_release(candidate):
+                continue
+            year = parse_year(candidate.data.get("year"))
+            if year is None:
+                year = float("inf")
+            if first_cd_release is None or year < earliest:
+                first_cd_release, earliest = candidate, year
+
+        if first_cd_release is None:
             self.logger.warning(
                 "No CD release found for '%s' by '%s'", album_name, artist_name
             )
             return {}
 
-        # Sort CD releases by year to find the earliest one
-        def get_release_year(release):
-            try:
-                return int(release.year)
-            except (TypeError, ValueError):
-                return float("inf")  # Assign infinity if year is invalid or None
-
-        first_cd_release = min(cd_releases, key=get_release_year)
-
-        release = first_cd_release
-        album_title = release.title
+        # Hydrate the chosen release with a single GET, then read its raw data so no
+        # further attribute access goes back over HTTP
+        first_cd_release.refresh()
+        release = first_cd_release.data
+        album_title = release.get("title", "")
 
         # Check if the album title starts with the artist's name followed by a delimiter
-        pattern = re.compile(rf"^{re.escape(artist_name)}\s*[-:]\s*(.*)", re.IGNORECASE)
-        match = pattern.match(album_title)
-        if match:
-            self.logger.critical(
-                "Found artist name prepended to album name, stripping: %s",
-                match.group(1),
-            )
-            album_title = match.group(1).strip()
-
+        # Plain string operations, so the common case never touches the regex engine
+        prefix_length = len(artist_name)
+        if album_title[:prefix_length].casefold() == artist_name.casefold():
+            rest = album_title[prefix_length:].lstrip()
+            if rest[:1] in ("-", ":"):
+                album_title = rest[1:].strip()
+                self.logger.debug(
+                    "Found artist name prepended to album name, stripping: %s",
+                    album_title,
+                )
+
+        images = release.get("images")
         album_details = {
             "name": album_title,
-            "genres": release.genres if release.genres else None,
-            "image": release.images[0]["uri"] if release.images else None,
-            "url": release.url,
+            "genres": release.get("genres") or None,
+            "image": images[0]["uri"] if images else None,
+            "url": release.get("uri"),
         }
 
         # Get release date in the format "YYYY-MM"
-        release_date = str(release.year)
-        if release_date != "0" and release_date is not None:
-            release_date += "-01"
-            album_details["release_date"] = release_date
+        year = parse_year(release.get("year"))
+        if year is not None:
+            album_details["release_date"] = f"{year:04d}-01"
         else:
-            album_details["release_date"] = None
-
-        if not album_details["release_date"]:
             self.logger.warning(
                 "Falling back to finding release date from all releases"
             )
             album_details["release_date"] = self.find_release_date(releases)
 
-        # Get total number of tracks
-        album_details["total_tracks"] = len(release.tracklist)
-        tracks = []
-        for track in release.tracklist:
-            tracks.append(
-                {
-                    "name": track.title,
-                    "duration": track.duration,
-                    "explicit": None,  # Discogs does not provide explicit info
-                }
-            )
-        # Convert duration to seconds
-        for track in tracks:
-            duration = track["duration"]
-            if duration:
-                minutes, seconds = duration.split(":")
-                duration_seconds = int(minutes) * 60 + int(seconds)
-                track["duration"] = duration_seconds
+        # Build the tracklist, converting "MM:SS" durations to seconds in the same pass
+        tracks = [
+            {
+                "name": track.get("title"),
+                "duration": parse_duration(track.get("duration")),
+                "explicit": None,  # Discogs does not provide explicit info
+            }
+            for track in release.get("tracklist", [])
+        ]
+        album_details["total_tracks"] = len(tracks)
         album_details["tracks"] = tracks
 
         return album_details
@@ -0,0 +1,49 @@
+"""
+Shared aiohttp session for collectors that call plain HTTP APIs directly.
+"""
+
+import logging
+from typing import Optional
+import aiohttp
+
+
+# Logging is configured once by the application entrypoint
+logger = logging.getLogger(__name__)
+
+# Connection pool limits; keep-alive connections are reused across lookups
+MAX_CONNECTIONS = 32
+DNS_CACHE_TTL = 600  # Seconds
+TIMEOUT = aiohttp.ClientTimeout(total=10)  # Seconds
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Get the shared aiohttp session, creating it on first use.
+
+    Must be called from within a running event loop.
+
+    Returns:
+    - aiohttp.ClientSession: The shared session.
+    """
+    global _session
+    if _session is None or _session.closed:
+        logger.info("Creating shared HTTP session")
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=MAX_CONNECTIONS, ttl_dns_cache=DNS_CACHE_TTL
+            ),
+            timeout=TIMEOUT,
+        )
+    return _session
+
+
+async def close_session() -> None:
+    """
+    Close the shared aiohttp session, if one was created.
+    """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -2,10 +2,16 @@
 Fetch metadata from the MusicBrainz API.
 """
 
+import asyncio
+import functools
+import logging
 import os
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
+import aiohttp
 import musicbrainzngs  # https://python-musicbrainzngs.readthedocs.io/en/v0.7.1/
 from app.collectors.base import MetadataCollector
+from app.collectors.http_session import get_session
 from app.collectors.wikimedia import fetch_wikimedia_image
 
 
@@ -13,6 +19,56 @@ load_dotenv()
 USER_AGENT = os.getenv("MUSICBRAINZ_USER_AGENT_NAME")
 VERSION = os.getenv("MUSICBRAINZ_USER_AGENT_VERSION")
 CONTACT = os.getenv("MUSICBRAINZ_USER_AGENT_CONTACT")
+# musicbrainzngs keeps its user agent globally, so configure it once at import
+musicbrainzngs.set_useragent(USER_AGENT, VERSION, CONTACT)
+# Cover Art Archive release endpoint
+COVER_ART_API = "https://coverartarchive.org/release"
+# Errors from a failed request or an undecodable (e.g. HTML error page) body
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ValueError)
+GENRES_FILE = os.path.join(os.path.dirname(__file__), "genres.txt")
+
+# Domains (and their subdomains) whose URL relations are resolved via Wikimedia Commons
+WIKIMEDIA_DOMAINS = frozenset({"wikimedia.org"})
+_WIKIMEDIA_SUFFIXES = tuple(f".{domain}" for domain in WIKIMEDIA_DOMAINS)
+
+
+@functools.lru_cache(maxsize=1)
+def load_genres() -> frozenset:
+    """
+    Load the official list of MusicBrainz genres. The file is static, so it is read
+    once per process.
+
+    Returns:
+    - frozenset: Genre names (in lowercase).
+
+    Raises:
+    - FileNotFoundError: If the genres.txt file is not found.
+    """
+    try:
+        with open(GENRES_FILE, "r", encoding="utf-8") as file:
+            return frozenset(line.strip().lower() for line in file if line.strip())
+    except FileNotFoundError as exc:
+        raise FileNotFoundError("The genres.txt file was not found.") from exc
+
+
+def is_wikimedia_url(url: str) -> bool:
+    """
+    Check whether a URL points to a Wikimedia host.
+
+    Parameters:
+    - url (str): The URL to check.
+
+    Returns:
+    - bool: True if the URL's host is one of WIKIMEDIA_DOMAINS or a subdomain of one.
+
+    Example:
+    - is_wikimedia_url("https://commons.wikimedia.org/wiki/File:Example.jpg") -> True
+    - is_wikimedia_url("https://notwikimedia.org/") -> False
+    """
+    hostname = urlsplit(url).hostname
+    return hostname is not None and (
+        hostname in WIKIMEDIA_DOMAINS or hostname.endswith(_WIKIMEDIA_SUFFIXES)
+    )
 
 
 class MusicBrainzCollector(MetadataCollector):
@@ -23,67 +79,74 @@ class MusicBrainzCollector(MetadataCollector):
     Refer to https://musicbrainz.org/doc/XML_Web_Service/Rate_Limiting
     """
 
+    # musicbrainzngs rate-limits every call behind a global lock that is held for the
+    # whole request, so calls wait their turn here rather than each parking a worker
+    # thread (shared with every other to_thread user) on that lock
+    _semaphore = asyncio.Semaphore(1)
+
     def __init__(self, name: str):
         super().__init__(name)
         self.logger.info("Initializing MusicBrainzCollector")
 
-        musicbrainzngs.set_useragent(USER_AGENT, VERSION, CONTACT)
-        self.logger.info("MusicBrainzCollector initialized")
+    async def call(self, func, *args, **kwargs):
+        """
+        Run a blocking musicbrainzngs call in a worker thread, one call at a time.
+
+        Parameters:
+        - func (Callable): The function to call, e.g. musicbrainzngs.search_artists.
+        - args, kwargs: The arguments to call it with.
+
+        Returns:
+        - The function's return value.
 
-    def get_genre_list(self) -> set:
+        Raises:
+        - musicbrainzngs.WebServiceError: If the request fails.
+        """
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    def get_genre_list(self) -> frozenset:
         """
         Retrieve the official list of genres from MusicBrainz.
 
         Assumes the genres.txt file is in the collectors directory.
 
         Returns:
-        - set: Genre names (in lowercase).
+        - frozenset: Genre names (in lowercase).
 
         Raises:
         - FileNotFoundError: If the genres.txt file is not found.
         """
-        try:
-            with open("/app/app/collectors/genres.txt", "r", encoding="utf-8") as file:
-                genres = {line.strip().lower() for line in file if line.strip()}
-            return genres
-        except FileNotFoundError as exc:
-            raise FileNotFoundError("The genres.txt file was not found.") from exc
+        return load_genres()
 
-    def fetch_artist_image(self, artist_data) -> str:
+    async def fetch_artist_image(self, artist_data) -> str:
         """
         Fetch the artist's image from Wikimedia Commons via MusicBrainz relationships.
 
         Parameters:
-        - artist_name (str): The name of the artist to fetch the image for.
+        - artist_data (dict): The artist data from the MusicBrainz API, fetched with
+            the "url-rels" include. Artists without URL relationships have no
+            "url-relation-list" key, and no image.
 
         Returns:
         - str: URL to the artist's image if available, None otherwise.
 
         Raises:
-        - musicbrainzngs.WebServiceError: If there is an error fetching the artist's relationships.
+        - aiohttp.ClientError, asyncio.TimeoutError, ValueError: If the image could
+            not be fetched from Wikimedia Commons.
         """
-        try:
-            artist_info = musicbrainzngs.get_artist_by_id(
-                artist_data["id"], includes=["url-rels"]
-            )
-
-            commons_url = None
-            for rel in artist_info["artist"].get("url-relation-list", []):
-                self.logger.debug("Found URL: %s", rel["target"])
-                if "wikimedia.org" in rel["target"]:
-                    self.logger.debug("Found Wikimedia Commons URL: %s", rel["target"])
-                    commons_url = rel["target"]
-                    break
-            if not commons_url:
-                return None
-
-            # Fetch image from Wikimedia Commons
-            image_url = fetch_wikimedia_image(commons_url)
-            return image_url
-
-        except musicbrainzngs.WebServiceError as e:
-            print(f"Error fetching relationships: {e}")
+        relations = artist_data.get("url-relation-list", [])
+        commons_url = next(
+            (rel["target"] for rel in relations if is_wikimedia_url(rel["target"])),
+            None,
+        )
+        if not commons_url:
             return None
+        self.logger.debug("Found Wikimedia Commons URL: %s", commons_url)
+
+        # Fetch image from Wikimedia Commons
+        image_url = await fetch_wikimedia_image(commons_url)
+        return image_url
 
     def get_english_aliases(self, artist_data) -> list:
         """
@@ -98,9 +161,10 @@ class MusicBrainzCollector(MetadataCollector):
         Raises:
         - KeyError: If there is an error extracting the aliases.
         """
-        self.logger.debug(
-            "Extracting English aliases from artist data: %s", artist_data
-        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Extracting English aliases from artist data: %s", artist_data
+            )
         try:
             english_aliases = [
                 alias["alias"]
@@ -142,44 +206,71 @@ class MusicBrainzCollector(MetadataCollector):
         """
         self.logger.info("Fetching MusicBrainz details for artist: %s", artist_name)
 
+        key = self.cache_key("artist", artist_name)
+        if (cached := self.cache.get(key)) is not None:
+            self.logger.debug("Cache hit for %s", key)
+            return cached
+
+        artist_details, complete = await self._fetch_artist_details(artist_name)
+        if complete:
+            self.cache_result(key, artist_details)
+        return artist_details
+
+    async def _fetch_artist_details(self, artist_name: str) -> tuple[dict, bool]:
+        """
+        Uncached implementation of fetch_artist_details.
+
+        Returns:
+        - tuple: The artist details, and whether every lookup succeeded. Details
+            with values missing because a lookup failed shouldn't be cached.
+        """
         try:
-            result = musicbrainzngs.search_artists(artist=artist_name, limit=1)
+            # musicbrainzngs is blocking, so run its calls in worker threads
+            result = await self.call(
+                musicbrainzngs.search_artists, artist=artist_name, limit=1
+            )
             artist_data = result["artist-list"][0] if result["artist-list"] else None
         except musicbrainzngs.WebServiceError as e:
             error_message = f"An error occurred: {str(e)}"
             self.logger.error(error_message)
-            return {"error": error_message}
+            return {"error": error_message}, False
 
         if not artist_data:
             self.logger.warning("No artist found for name: %s", artist_name)
-            return {}
+            return {}, True
 
+        complete = True
+        genres = None
+        image_url = None
+        aliases = self.get_english_aliases(artist_data)
         try:
-            # Get detailed artist information
-            artist_info = musicbrainzngs.get_artist_by_id(
-                artist_data["id"], includes=["tags", "aliases"]
+            # Get detailed artist information, including the URL relationships used to
+            # find an image, in a single rate-limited request
+            artist_info = await self.call(
+                musicbrainzngs.get_artist_by_id,
+                artist_data["id"],
+                includes=["tags", "aliases", "url-rels"],
             )
 
             # Get genres
             genre_list = self.get_genre_list()
-            # Filter tags to include only those that are recognized as genres
-            genres = [
-                tag["name"]
-                for tag in artist_info["artist"].get("tag-list", [])
-                if tag["name"].lower() in genre_list
-            ]
-
-            # Filter to first (top) 5 genres
-            genres = genres[:5]
-            if not genres:
-                genres = None
+            # Keep the first (top) 5 tags that are recognized as genres
+            genres = []
+            for tag in artist_info["artist"].get("tag-list", []):
+                if tag["name"].lower() in genre_list:
+                    genres.append(tag["name"])
+                    if len(genres) == 5:
+                        break
+            genres = genres or None
 
             # Get image
-            image_url = self.fetch_artist_image(artist_data)
-
-            aliases = self.get_english_aliases(artist_data)
+            image_url = await self.fetch_artist_image(artist_info["artist"])
         except musicbrainzngs.WebServiceError as e:
             self.logger.error("Error fetching genres: %s", str(e))
+            complete = False
+        except REQUEST_ERRORS as e:
+            self.logger.error("Error fetching artist image: %s", str(e))
+            complete = False
 
         artist_details = {
             "name": artist_data["name"],
@@ -191,12 +282,15 @@ class MusicBrainzCollector(MetadataCollector):
             "profile": artist_data.get("disambiguation", None),
         }
 
-        return artist_details
+        return artist_details, complete
 
-    def fetch_album_cover_art(self, release_data) -> str:
+    async def fetch_album_cover_art(self, release_data) -> str:
         """
         Fetch the cover art URL for a given album using the Cover Art Archive.
 
+        The Cover Art Archive is not rate limited like MusicBrainz, so it is queried
+        directly over the shared HTTP session rather than through musicbrainzngs.
+
         Parameters:
         - release_data (dict): The release data from the MusicBrainz API.
 
@@ -204,24 +298,56 @@ class MusicBrainzCollector(MetadataCollector):
         - str: URL to the album's cover art image if available, None otherwise.
 
         Raises:
-        - musicbrainzngs.WebServiceError: If there is an error fetching the cover art.
+        - aiohttp.ClientError: If the request fails or returns an error status.
+        - asyncio.TimeoutError: If the request times out.
+        - ValueError: If the response body is not valid JSON.
         """
-        try:
-            release_mbid = release_data["id"]
-
-            # Fetch cover art using the release MBID
-            cover_art = musicbrainzngs.get_image_list(release_mbid)
-            images = cover_art.get("images", [])
-            for image in images:
-                if "Front" in image.get("types", []) and image.get("approved", False):
-                    image_url = image["image"]
-                    self.logger.info("Found cover art URL: %s", image_url)
-                    return image_url
-            return None
+        release_mbid = release_data["id"]
+
+        # Fetch cover art using the release MBID
+        async with get_session().get(f"{COVER_ART_API}/{release_mbid}") as response:
+            if response.status == 404:
+                return None  # No cover art for this release
+            response.raise_for_status()
+            cover_art = await response.json(content_type=None)
+        images = cover_art.get("images", [])
+        for image in images:
+            if "Front" in image.get("types", []) and image.get("approved", False):
+                image_url = image["image"]
+                self.logger.info("Found cover art URL: %s", image_url)
+                return image_url
+        return None
+
+    def fetch_album_tracks(self, release_data) -> list:
+        """
+        Fetch the tracklist of the first medium of a release.
 
-        except musicbrainzngs.WebServiceError as e:
-            self.logger.error("Error fetching cover art: %s", str(e))
-            return None
+        Parameters:
+        - release_data (dict): The release data from the MusicBrainz API.
+
+        Returns:
+        - list: A list of track dictionaries with "name", "duration" and "explicit"
+            keys.
+
+        Raises:
+        - musicbrainzngs.WebServiceError: If there is an error fetching the tracklist.
+        """
+        release_info = musicbrainzngs.get_release_by_id(
+            release_data["id"], includes=["recordings"]
+        )
+        track_list = release_info["release"]["medium-list"][0]["track-list"]
+        return [
+            {
+                "name": track["recording"]["title"],
+                "duration": (
+                    int(length) // 1000
+                    if (length := track["recording"].get("length"))
+                    else None
+                ),
+                "explicit": None,  # MusicBrainz does not provide explicit info
+            }
+            for track in track_list
+        ]
 
     async def fetch_album_details(self, artist_name: str, album_name: str) -> dict:
         """
@@ -259,62 +385,81 @@ class MusicBrainzCollector(MetadataCollector):
             "Fetching MusicBrainz album: '%s' by artist: '%s'", album_name, artist_name
         )
 
+        key = self.cache_key("album", artist_name, album_name)
+        if (cached := self.cache.get(key)) is not None:
+            self.logger.debug("Cache hit for %s", key)
+            return cached
+
+        album_details, complete = await self._fetch_album_details(
+            artist_name, album_name
+        )
+        if complete:
+            self.cache_result(key, album_details)
+        return album_details
+
+    async def _fetch_album_details(
+        self, artist_name: str, album_name: str
+    ) -> tuple[dict, bool]:
+        """
+        Uncached implementation of fetch_album_details.
+
+        Returns:
+        - tuple: The album details, and whether every lookup succeeded. Details
+            with values missing because a lookup failed shouldn't be cached.
+        """
         try:
-            result = musicbrainzngs.search_releases(
-                artist=artist_name, release=album_name, limit=1
+            # musicbrainzngs is blocking, so run its calls in worker threads
+            result = await self.call(
+                musicbrainzngs.search_releases,
+                artist=artist_name,
+                release=album_name,
+                limit=1,
             )
             release_data = result["release-list"][0] if result["release-list"] else None
         except musicbrainzngs.WebServiceError as e:
             error_message = f"An error occurred: {str(e)}"
             self.logger.error(error_message)
-            return {"error": error_message}
+            return {"error": error_message}, False
 
         if not release_data:
             self.logger.warning(
                 "No album found for '%s' by '%s'", album_name, artist_name
             )
-            return {}
+            return {}, True
+
+        # Cover art and tracklist are independent, so fetch them concurrently
+        image_url, tracks = await asyncio.gather(
+            self.fetch_album_cover_art(release_data),
+            self.call(self.fetch_album_tracks, release_data),
+            return_exceptions=True,
+        )
+        complete = True
+        if isinstance(image_url, REQUEST_ERRORS):
+            self.logger.error("Error fetching cover art: %s", str(image_url))
+            image_url, complete = None, False
+        elif isinstance(image_url, BaseException):
+            raise image_url
+        if isinstance(tracks, musicbrainzngs.WebServiceError):
+            self.logger.error("Error fetching tracklist: %s", str(tracks))
+            tracks, complete = None, False
+        elif isinstance(tracks, BaseException):
+            raise tracks
 
         album_details = {
             "name": release_data["title"],
             "genres": release_data.get("tag-list", None) or None,
-            "image": self.fetch_album_cover_art(release_data),
-            "total_tracks": None,  # Additional query below for tracklist
-            "tracks": None,
+            "image": image_url,
+            "total_tracks": len(tracks) if tracks is not None else None,
+            "tracks": tracks,
             "url": f"https://musicbrainz.org/release/{release_data['id']}",
         }
 
-        # Releast date should be in the format: "YYYY-MM"
-        release_date = release_data.get("date", None)
-        release_date = release_date[:7]  # Extract "YYYY-MM" from "YYYY-MM-DD"
-        album_details["release_date"] = release_date
-
-        # Check for YYYY only
+        # Release date should be in the format: "YYYY-MM"
+        release_date = release_data.get("date") or ""
         if len(release_date) == 4:
-            # Append -01 to make it "YYYY-MM"
-            album_details["release_date"] += "-01"
+            release_date += "-01"  # Append -01 to make "YYYY" into "YYYY-MM"
+        else:
+            release_date = release_date[:7]  # Extract "YYYY-MM" from "YYYY-MM-DD"
+        album_details["release_date"] = release_date or None
 
-        # Fetch detailed release information to get tracklist
-        try:
-            release_info = musicbrainzngs.get_release_by_id(
-                release_data["id"], includes=["recordings"]
-            )
-            track_list = release_info["release"]["medium-list"][0]["track-list"]
-            tracks = [
-                {
-                    "name": track["recording"]["title"],
-                    "duration": (
-                        int(track["recording"]["length"]) // 1000
-                        if "length" in track["recording"]
-                        else None
-                    ),
-                    "explicit": None,  # MusicBrainz does not provide explicit info
-                }
-                for track in track_list
-            ]
-            album_details["total_tracks"] = len(tracks)
-            album_details["tracks"] = tracks
-        except musicbrainzngs.WebServiceError as e:
-            self.logger.error("Error fetching tracklist: %s", str(e))
-
-        return album_details
+        return album_details, complete
@@ -3,37 +3,152 @@ Fetch metadata from Spotify's API.
 """
 
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 import os
+import threading
 from dotenv import load_dotenv
-import spotipy  # https://github.com/spotipy-dev/spotipy?tab=readme-ov-file
+import aiohttp
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.exceptions import SpotifyOauthError
 from spotipy.oauth2 import SpotifyClientCredentials
 from app.collectors.base import MetadataCollector
+from app.collectors.http_session import get_session
 
 
 load_dotenv()
 CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+# Maximum number of Spotify requests in flight at once
+MAX_CONCURRENCY = int(os.getenv("SPOTIFY_MAX_CONCURRENCY", "8"))
+
+# Retries for rate-limited (429) or unauthorized (401) responses
+MAX_RETRIES = 3
+# Longest Retry-After (in seconds) worth waiting for; beyond it the request fails
+MAX_RETRY_DELAY = 30
+
+# Spotify Web API base URL
+API = "https://api.spotify.com/v1"
+
+# Errors from the token request or the API call that are reported as {"error": ...}
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, SpotifyOauthError)
+
+
+def retry_after(response: aiohttp.ClientResponse, default: float) -> float:
+    """
+    Read the delay requested by a rate-limited response.
+
+    Parameters:
+    - response (aiohttp.ClientResponse): The 429 response.
+    - default (float): The delay to use if the header is missing or invalid.
+
+    Returns:
+    - float: The number of seconds to wait before retrying.
+    """
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return default
 
 
 class SpotifyCollector(MetadataCollector):
     """
     Fetch metadata from Spotify's API.
 
+    The Web API is called directly over the shared aiohttp session; Spotipy is only
+    used to obtain and cache the client-credentials access token.
+
     https://developer.spotify.com/documentation/web-api
     """
 
+    # Shared by all instances, so the access token is reused
+    _auth = None
+    _auth_lock = threading.Lock()
+    # Cap in-flight requests so bursts don't trip the rate limit
+    _semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
     def __init__(self, name: str):
         super().__init__(name)
         self.logger.info("Initializing SpotifyCollector")
 
-        self.client = spotipy.Spotify(
-            auth_manager=SpotifyClientCredentials(
-                client_id=CLIENT_ID, client_secret=CLIENT_SECRET
-            )
+        with SpotifyCollector._auth_lock:
+            if SpotifyCollector._auth is None:
+                SpotifyCollector._auth = SpotifyClientCredentials(
+                    client_id=CLIENT_ID,
+                    client_secret=CLIENT_SECRET,
+                    cache_handler=MemoryCacheHandler(),
+                )
+                self.logger.info("Spotify credentials initialized")
+        self.auth = SpotifyCollector._auth
+
+    async def access_token(self, refresh: bool = False) -> str:
+        """
+        Get a client-credentials access token for the Spotify Web API.
+
+        Parameters:
+        - refresh (bool): Request a new token even if the cached one looks valid,
+            e.g. after the API rejected it.
+
+        Returns:
+        - str: The access token.
+
+        Raises:
+        - SpotifyOauthError: If a new access token could not be obtained.
+        """
+        # A valid cached token is read straight from memory, on the event loop
+        if not refresh:
+            token_info = self.auth.cache_handler.get_cached_token()
+            if token_info and not self.auth.is_token_expired(token_info):
+                return token_info["access_token"]
+
+        # Requesting a new token is blocking HTTP, so keep it off the event loop
+        return await asyncio.to_thread(
+            self.auth.get_access_token, as_dict=False, check_cache=False
         )
-        self.logger.info("Spotify client initialized")
-        self.executor = ThreadPoolExecutor(max_workers=5)
+
+    async def get(self, url: str, params: dict = None) -> dict:
+        """
+        Send an authenticated GET request to the Spotify Web API.
+
+        Parameters:
+        - url (str): The endpoint URL, e.g. f"{API}/search".
+        - params (dict): Query parameters, if any.
+
+        Returns:
+        - dict: The decoded JSON response.
+
+        Rate-limited (429) responses are retried after the server's Retry-After delay,
+        and a rejected token (401) is refreshed and retried, up to MAX_RETRIES times.
+
+        Raises:
+        - SpotifyOauthError: If the access token could not be obtained.
+        - aiohttp.ClientError: If the request fails or returns an error status.
+        """
+        refresh = False
+        for attempt in range(MAX_RETRIES + 1):
+            token = await self.access_token(refresh=refresh)
+            refresh = False
+            async with self._semaphore:
+                async with get_session().get(
+                    url, params=params, headers={"Authorization": f"Bearer {token}"}
+                ) as response:
+                    delay = None
+                    if attempt < MAX_RETRIES:
+                        if response.status == 429:
+                            delay = retry_after(response, default=2**attempt)
+                        elif response.status == 401:
+                            delay = 0
+                            refresh = True  # Force a new token
+                    if delay is None or delay > MAX_RETRY_DELAY:
+                        response.raise_for_status()
+                        return await response.json()
+
+            self.logger.warning(
+                "Spotify returned %d for %s, retrying in %.1fs",
+                response.status,
+                url,
+                delay,
+            )
+            # Sleep outside the semaphore so other requests aren't held up
+            await asyncio.sleep(delay)
 
     async def fetch_artist_details(self, artist_name: str) -> dict:
         """
@@ -60,22 +175,30 @@ class SpotifyCollector(MetadataCollector):
         If a value is not available, it should be set to None.
 
         Raises:
-        - SpotifyException: If there is an error fetching the artist details.
         - CancelledError: If the coroutine is cancelled.
         """
         self.logger.info("Fetching Spotify details for artist: %s", artist_name)
 
-        loop = asyncio.get_event_loop()
+        key = self.cache_key("artist", artist_name)
+        if (cached := self.cache.get(key)) is not None:
+            self.logger.debug("Cache hit for %s", key)
+            return cached
+
+        artist_details = await self._fetch_artist_details(artist_name)
+        self.cache_result(key, artist_details)
+        return artist_details
+
+    async def _fetch_artist_details(self, artist_name: str) -> dict:
+        """
+        Uncached implementation of fetch_artist_details.
+        """
         try:
-            # Run the blocking Spotipy call in an executor to prevent blocking the event loop
-            results = await loop.run_in_executor(
-                self.executor,
-                lambda: self.client.search(
-                    q=f'artist:"{artist_name}"', type="artist", limit=1
-                ),
+            results = await self.get(
+                f"{API}/search",
+                params={"q": f'artist:"{artist_name}"', "type": "artist", "limit": 1},
             )
             artists = results.get("artists", {}).get("items", [])
-        except spotipy.exceptions.SpotifyException as e:
+        except REQUEST_ERRORS as e:
             self.logger.error("Spotify API error fetching artist details: %s", e)
             return {"error": str(e)}
         except asyncio.CancelledError as e:
@@ -87,17 +210,14 @@ class SpotifyCollector(MetadataCollector):
             return {}
 
         artist_data = artists[0]
-        genres = artist_data.get("genres", None)
-        if genres:
-            genres = genres[:5]  # Top 5 genres
+        genres = artist_data.get("genres")
+        images = artist_data.get("images")
 
         artist_details = {
             "name": artist_data.get("name"),
             "namevariations": None,  # Spotify does not provide name variations
-            "genres": genres if genres else None,
-            "image": (
-                artist_data["images"][0]["url"] if artist_data.get("images") else None
-            ),
+            "genres": genres[:5] if genres else None,  # Top 5 genres
+            "image": images[0]["url"] if images else None,
             "url": artist_data["external_urls"].get("spotify"),
             "popularity": artist_data.get("popularity"),
             "profile": None,  # Spotify does not provide artist profile text
@@ -105,6 +225,29 @@ class SpotifyCollector(MetadataCollector):
 
         return artist_details
 
+    async def get_album_tracks(self, album_id: str) -> list:
+        """
+        Fetch every track of an album.
+
+        The album endpoint embeds the first page of tracks, so albums with up to 50
+        tracks need a single request. Longer albums are paged through.
+
+        Parameters:
+        - album_id (str): The Spotify ID of the album.
+
+        Returns:
+        - list: The simplified track objects of the album.
+
+        Raises:
+        - aiohttp.ClientError: If there is an error fetching the tracks.
+        """
+        page = (await self.get(f"{API}/albums/{album_id}"))["tracks"]
+        items = list(page["items"])
+        while page.get("next"):
+            page = await self.get(page["next"])
+            items.extend(page["items"])
+        return items
+
     async def fetch_album_details(self, artist_name: str, album_name: str) -> dict:
         """
         Fetch album details fromthe Spotify API.
@@ -138,31 +281,43 @@ class SpotifyCollector(MetadataCollector):
             "Fetching Spotify album: '%s' by artist: '%s'", album_name, artist_name
         )
 
-        loop = asyncio.get_event_loop()
+        key = self.cache_key("album", artist_name, album_name)
+        if (cached := self.cache.get(key)) is not None:
+            self.logger.debug("Cache hit for %s", key)
+            return cached
+
+        album_details = await self._fetch_album_details(artist_name, album_name)
+        self.cache_result(key, album_details)
+        return album_details
+
+    async def _fetch_album_details(self, artist_name: str, album_name: str) -> dict:
+        """
+        Uncached implementation of fetch_album_details.
+        """
         try:
-            # Run the blocking Spotipy call in an executor
-            albums = await loop.run_in_executor(
-                self.executor,
-                lambda: self.client.search(
-                    q=f'album:"{album_name}" artist:"{artist_name}"',
-                    type="album",
-                    limit=1,
-                ),
+            albums = await self.get(
+                f"{API}/search",
+                params={
+                    "q": f'album:"{album_name}" artist:"{artist_name}"',
+                    "type": "album",
+                    "limit": 1,
+                },
             )
-        except spotipy.exceptions.SpotifyException as e:
+        except REQUEST_ERRORS as e:
             self.logger.error("Spotify API error fetching album details: %s", e)
             return {"error": str(e)}
         except asyncio.CancelledError as e:
             self.logger.error("Error fetching album details: %s", e)
             return {"error": str(e)}
 
-        if not albums or not albums.get("albums", {}).get("items"):
+        items = albums.get("albums", {}).get("items") if albums else None
+        if not items:
             self.logger.warning(
                 "No album found for '%s' by '%s'", album_name, artist_name
             )
             return {}
 
-        album_data = albums["albums"]["items"][0]
+        album_data = items[0]
         album_id = album_data.get("id")
 
         if not album_id:
@@ -174,21 +329,19 @@ class SpotifyCollector(MetadataCollector):
         # Fetch album tracks
         self.logger.info("Fetching tracks for album id: %s", album_id)
         try:
-            tracks_data = await loop.run_in_executor(
-                self.executor, lambda: self.client.album_tracks(album_id)
-            )
+            track_items = await self.get_album_tracks(album_id)
             tracks = [
                 {
                     "name": track.get("name"),
-                    "duration": int(track.get("duration_ms", 0) / 1000),
-                    "explicit": track.get("explicit", None),
+                    "duration": track.get("duration_ms", 0) // 1000,
+                    "explicit": track.get("explicit"),
                 }
-                for track in tracks_data.get("items", [])
+                for track in track_items
             ]
             self.logger.info(
                 "Fetched %d tracks for album id: %s", len(tracks), album_id
             )
-        except spotipy.exceptions.SpotifyException as e:
+        except REQUEST_ERRORS as e:
             self.logger.error("Spotify API error fetching tracks: %s", e)
             return {"error": str(e)}
         except asyncio.CancelledError as e:
@@ -196,21 +349,17 @@ class SpotifyCollector(MetadataCollector):
             return {"error": str(e)}
 
         # Standardize release date
+        # Padding with "-01" then truncating turns "YYYY", "YYYY-MM" and "YYYY-MM-DD"
+        # (year, month and day precision) into "YYYY-MM" without branching
         release_date = album_data.get("release_date")
-        release_date_precision = album_data.get("release_date_precision")
-        if release_date and release_date_precision:
-            if release_date_precision == "day":
-                release_date = release_date[:7]  # "YYYY-MM"
-            elif release_date_precision == "year":
-                release_date = f"{release_date}-01"  # "YYYY-MM"
-            # If precision is "month", it's already "YYYY-MM"
+        if release_date:
+            release_date = f"{release_date}-01"[:7]
 
+        images = album_data.get("images")
         album_details = {
             "name": album_data.get("name"),
             "genres": None,  # Spotify does not provide album genres
-            "image": (
-                album_data["images"][0]["url"] if album_data.get("images") else None
-            ),
+            "image": images[0]["url"] if images else None,
             "release_date": release_date,
             "total_tracks": album_data.get("total_tracks"),
             "tracks": tracks,
@@ -2,42 +2,70 @@
 Fetch information from Wikimedia Commons.
 """
 
+import asyncio
 import logging
-import requests
+from urllib.parse import unquote, urlsplit
+from app.collectors.http_session import get_session
 
 
-logging.basicConfig(level=logging.DEBUG)
+# Logging is configured once by the application entrypoint
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 
 # Wikimedia Commons API endpoint
 API = "https://commons.wikimedia.org/w/api.php"
+# Wikimedia asks API clients to identify themselves; generic agents get throttled
+USER_AGENT = "album-wiz/1.0 (+https://github.com/mdrxy/album-wiz)"
 
+# Transient statuses worth retrying, and how many times
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3  # Seconds, doubled after each attempt
 
-def fetch_wikimedia_image(commons_url: str) -> str:
+# Cap in-flight requests so concurrent lookups stay polite to Wikimedia
+MAX_CONCURRENCY = 10
+_semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+
+def get_page_title(commons_url: str) -> str:
     """
-    Fetch the primary image URL from a Wikimedia Commons page.
+    Extract the page title from a Wikimedia Commons URL.
 
     Parameters:
     - commons_url (str): The URL to the Wikimedia Commons page.
 
+    Returns:
+    - str: The page title.
+
+    Example:
+    - Input: "https://commons.wikimedia.org/wiki/File:Example%20image.jpg"
+        -> "File:Example image.jpg"
+    """
+    return unquote(urlsplit(commons_url).path.rsplit("/", 1)[-1])
+
+
+async def fetch_wikimedia_image_by_title(page_title: str) -> str:
+    """
+    Fetch the primary image URL of a Wikimedia Commons page, given its title.
+
+    Parameters:
+    - page_title (str): The title of the Wikimedia Commons page.
+
     Returns:
     - str: URL to the image if available, None otherwise.
 
     Raises:
-    - requests.RequestException: If an error occurs while fetching the image.
+    - aiohttp.ClientError: If the request fails or returns an error status.
+    - asyncio.TimeoutError: If the request times out.
+    - ValueError: If the response body is not valid JSON.
 
     Example:
-    - Input: "https://commons.wikimedia.org/wiki/File:Example.jpg"
+    - Input: "File:Example.jpg"
         -> "https://upload.wikimedia.org/wikipedia/commons/0/0c/Example.jpg"
     """
-    try:
-        # Extract page title from the URL
-        page_title = commons_url.split("/")[-1]
-
-        # Make a request to the Wikimedia Commons API to get the file information
-        response = requests.get(
+    # Make a request to the Wikimedia Commons API to get the file information
+    for attempt in range(MAX_RETRIES + 1):
+        async with _semaphore, get_session().get(
             API,
             params={
                 "action": "query",
@@ -46,18 +74,46 @@ def fetch_wikimedia_image(commons_url: str) -> str:
                 "iiprop": "url",
                 "format": "json",
             },
-            timeout=5,
+            headers={"User-Agent": USER_AGENT},
+        ) as response:
+            if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                response.raise_for_status()
+                # Decode regardless of the declared type; a non-JSON body raises
+                data = await response.json(content_type=None)
+                break
+        delay = RETRY_BACKOFF * 2**attempt
+        logger.warning(
+            "Wikimedia Commons returned %d, retrying in %.1fs",
+            response.status,
+            delay,
         )
-        response.raise_for_status()
-        data = response.json()
-
-        # Extract the image URL from the response
-        pages = data.get("query", {}).get("pages", {})
-        for page in pages.values():
-            if "imageinfo" in page:
-                return page["imageinfo"][0]["url"]
-
-        return None
-    except requests.RequestException as e:
-        print(f"Error fetching image from Wikimedia Commons: {e}")
-        return None
+        await asyncio.sleep(delay)
+
+    # Extract the image URL from the response
+    pages = data.get("query", {}).get("pages", {})
+    for page in pages.values():
+        if "imageinfo" in page:
+            return page["imageinfo"][0]["url"]
+
+    return None
+
+
+async def fetch_wikimedia_image(commons_url: str) -> str:
+    """
+    Fetch the primary image URL from a Wikimedia Commons page.
+
+    Parameters:
+    - commons_url (str): The URL to the Wikimedia Commons page.
+
+    Returns:
+    - str: URL to the image if available, None otherwise.
+
+    Raises:
+    - aiohttp.ClientError, asyncio.TimeoutError, ValueError: See
+        fetch_wikimedia_image_by_title().
+
+    Example:
+    - Input: "https://commons.wikimedia.org/wiki/File:Example.jpg"
+        -> "https://upload.wikimedia.org/wikipedia/commons/0/0c/Example.jpg"
+    """
+    return await fetch_wikimedia_image_by_title(get_page_title(commons_url))
@@ -7,23 +7,334 @@ Expects columns:
 - Artist (artist name string)
 """
 
+import asyncio
 import logging
+from contextlib import aclosing
+from typing import AsyncIterator, Callable
+import asyncpg
 import pandas as pd
 from fastapi import FastAPI
-from datetime import datetime
 
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Logging is configured once by the application entrypoint
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 logger.info("Initializing import_csv module")
 
+# Rows parsed and written at a time, so memory use doesn't grow with the file
+CHUNK_SIZE = 10_000
+
+# Columns read from each kind of CSV, with their types; any others are skipped while
+# parsing. Declaring the types spares pandas from inferring them for every chunk
+ALBUM_COLUMNS = {
+    "Artist": "string",
+    "Release": "string",
+    "Ground Truth": "string",
+    "Released": "string",  # Parsed into dates by clean_albums()
+    "AlbumURL": "string",
+    "Genres": "string",
+    "DurationSeconds": "Int64",
+}
+SONG_COLUMNS = {
+    "AlbumTitle": "string",
+    "SongTitle": "string",
+    "DurationSeconds": "Int64",
+    "Explicit": "string",  # Converted to booleans by clean_songs()
+}
+
+# Accepted spellings of the 'Explicit' column (after trimming and lowercasing)
+EXPLICIT_VALUES = {
+    "true": True,
+    "t": True,
+    "yes": True,
+    "1": True,
+    "false": False,
+    "f": False,
+    "no": False,
+    "0": False,
+    "none": None,
+    "": None,
+}
+
+
+class CSVValidationError(ValueError):
+    """
+    Raised when a CSV file cannot be parsed or holds invalid data.
+
+    Kept apart from other ValueErrors (e.g. asyncpg.DataError, raised when the
+    database rejects a value), so only malformed files are reported as such.
+    """
+
+
+def to_records(data: pd.DataFrame, columns: list):
+    """
+    Iterate over the rows of a DataFrame as tuples of plain Python values.
+
+    asyncpg cannot encode pandas' missing-value markers (NaN, pd.NA), so they are
+    replaced with None and sent as NULL.
+
+    Parameters:
+    - data (pd.DataFrame): The rows.
+    - columns (list): The columns to include, in order.
+
+    Returns:
+    - iterator: One tuple per row.
+    """
+    # Converting whole columns to object arrays yields Python scalars without
+    # building a DataFrame or Series per row
+    return zip(
+        *(data[column].to_numpy(dtype=object, na_value=None) for column in columns)
+    )
+
+
+async def read_chunks(
+    reader, clean: Callable[[pd.DataFrame], pd.DataFrame]
+) -> AsyncIterator[pd.DataFrame]:
+    """
+    Read and clean CSV chunks in a worker thread, one chunk ahead of the caller.
+
+    While the caller writes one chunk to the database, the next one is already
+    being parsed, so parsing and database round-trips overlap. Use it with
+    contextlib.aclosing(), so the reader is closed as soon as the caller is done.
+
+    Parameters:
+    - reader (TextFileReader): The chunk iterator returned by pd.read_csv().
+    - clean (Callable): Validates and converts each chunk, e.g. clean_albums().
+
+    Returns:
+    - AsyncIterator[pd.DataFrame]: The cleaned chunks, in order.
+
+    Raises:
+    - CSVValidationError: If a chunk cannot be parsed, or fails to clean.
+    """
+
+    def read_next():
+        try:
+            data = next(reader, None)
+        except ValueError as e:  # e.g. pd.errors.ParserError, UnicodeDecodeError
+            raise CSVValidationError(f"Error reading CSV file: {e}") from e
+        return None if data is None else clean(data)
+
+    with reader:
+        pending = asyncio.ensure_future(asyncio.to_thread(read_next))
+        try:
+            while (data := await pending) is not None:
+                pending = asyncio.ensure_future(asyncio.to_thread(read_next))
+                yield data
+        finally:
+            # Let a read that is still running finish before the file is closed, even
+            # if the caller is cancelled meanwhile: the thread can't be interrupted
+            cancelled = None
+            while not pending.done():
+                try:
+                    await asyncio.wait([pending])
+                except asyncio.CancelledError as e:
+                    cancelled = e
+            # Retrieve its error, if any, so it isn't lost
+            if not pending.cancelled() and (error := pending.exception()):
+                logger.debug("Discarded error from reading the next chunk: %s", error)
+            if cancelled is not None:
+                raise cancelled
+
+
+async def copy_insert(
+    connection: asyncpg.Connection,
+    table: str,
+    columns: list,
+    records,
+    conflict: str,
+) -> int:
+    """
+    Bulk-insert rows with COPY, skipping those that conflict with existing rows.
+
+    COPY cannot skip conflicting rows itself, so the rows are streamed into a
+    temporary staging table and moved over with a single INSERT ... ON CONFLICT.
+    Must be called inside a transaction, so a failure also rolls back the staging
+    table.
+
+    Parameters:
+    - connection (asyncpg.Connection): The database connection.
+    - table (str): The table to insert into.
+    - columns (list): The columns to fill, in the order of each record.
+    - records (iterable): The rows to insert, as tuples.
+    - conflict (str): The conflict target, e.g. "title".
+
+    Returns:
+    - int: The number of rows inserted.
+    """
+    staging = f"staging_{table}"
+    column_list = ", ".join(columns)
+
+    # Copy only the column types, not the constraints or defaults
+    await connection.execute(
+        f"""
+        CREATE TEMPORARY TABLE {staging} AS
+        SELECT {column_list} FROM {table} WITH NO DATA;
+        """
+    )
+    await connection.copy_records_to_table(staging, records=records, columns=columns)
+    status = await connection.execute(
+        f"""
+        INSERT INTO {table} ({column_list})
+        SELECT {column_list} FROM {staging}
+        ON CONFLICT ({conflict}) DO NOTHING;
+        """
+    )
+    # Drop it right away, so the next chunk can create it again
+    await connection.execute(f"DROP TABLE {staging};")
+    return int(status.rsplit(" ", 1)[-1])  # "INSERT 0 <count>"
+
+
+async def disable_synchronous_commit(connection: asyncpg.Connection) -> None:
+    """
+    Let the current transaction commit without waiting for its WAL to reach disk.
+
+    The import's write-ahead log can be large, and the commit otherwise blocks until
+    all of it is flushed. If the server crashes within a moment of the commit, the
+    import may be lost, but never half-applied; since every insert skips existing
+    rows, re-running it is safe.
+
+    Parameters:
+    - connection (asyncpg.Connection): The database connection, in a transaction.
+    """
+    await connection.execute("SET LOCAL synchronous_commit = off;")
+
+
+def drop_duplicates(data: pd.DataFrame, key: list) -> pd.DataFrame:
+    """
+    Drop rows that repeat the key of an earlier row in the same chunk.
+
+    Only the first row per key would be inserted anyway, since inserts skip rows
+    whose key already exists; dropping the rest here saves sending them.
+
+    Parameters:
+    - data (pd.DataFrame): The rows.
+    - key (list): The columns that identify a row in the database.
+
+    Returns:
+    - pd.DataFrame: The rows, without duplicates.
+    """
+    deduplicated = data.drop_duplicates(subset=key, keep="first")
+    if len(deduplicated) < len(data):
+        logger.info("Dropped %d duplicate rows", len(data) - len(deduplicated))
+    return deduplicated
+
+
+def clean_albums(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Validate and convert a chunk of album rows read from a CSV file.
+
+    Parameters:
+    - data (pd.DataFrame): The album rows.
+
+    Returns:
+    - pd.DataFrame: The rows, with 'Released' parsed into dates, and rows without
+        an artist or with duplicate titles dropped.
+
+    Raises:
+    - CSVValidationError: If the 'Released' column is missing or holds an invalid
+        date.
+    """
+    # Handle the 'Released' column by adding a default day
+    if "Released" not in data.columns:
+        logger.error("'Released' column is missing in the CSV.")
+        raise CSVValidationError("'Released' column is missing in the CSV.")
+
+    # Skip albums without an artist, rather than inserting them unattributed
+    no_artist = data["Artist"].isna()
+    if no_artist.any():
+        logger.warning(
+            "Artist missing. Skipping %d albums: %s",
+            int(no_artist.sum()),
+            data.loc[no_artist, "Release"].tolist(),
+        )
+        data = data[~no_artist]
+
+    # Parse the whole column at once; "YYYY-MM" becomes the first of the month
+    released = pd.to_datetime(data["Released"], format="%Y-%m", errors="coerce")
+    invalid = data.loc[released.isna(), "Released"]
+    if not invalid.empty:
+        logger.error(
+            "Error parsing 'Released' dates in rows %s: %s",
+            invalid.index.tolist(),
+            invalid.tolist(),
+        )
+        raise CSVValidationError(
+            f"Invalid 'Released' dates (expected YYYY-MM): {invalid.tolist()}"
+        )
+    data = data.assign(Released=released.dt.date)
+    return drop_duplicates(data, ["Release"])
+
+
+async def insert_albums(connection: asyncpg.Connection, data: pd.DataFrame) -> int:
+    """
+    Insert a chunk of cleaned album rows, and any artists they introduce.
+
+    Each statement is sent once for the whole chunk rather than once per row, so a
+    chunk costs a handful of round-trips instead of two per album.
+
+    Parameters:
+    - connection (asyncpg.Connection): The database connection, in a transaction.
+    - data (pd.DataFrame): The album rows, as returned by clean_albums().
+
+    Returns:
+    - int: The number of albums inserted; albums with existing titles are skipped.
+    """
+    # Insert artists and look up the ids of new and existing ones at once
+    # The outer SELECT sees the table as it was before the INSERT, so the two halves
+    # of the UNION never overlap
+    artist_ids = dict(
+        await connection.fetch(
+            """
+            WITH inserted AS (
+                INSERT INTO artists (name)
+                SELECT unnest($1::text[])
+                ON CONFLICT (name) DO NOTHING
+                RETURNING name, id
+            )
+            SELECT name, id FROM inserted
+            UNION ALL
+            SELECT name, id FROM artists WHERE name = ANY($1::text[]);
+            """,
+            data["Artist"].dropna().unique().tolist(),
+        )
+    )
+
+    # Insert albums
+    return await copy_insert(
+        connection,
+        "albums",
+        [
+            "title",
+            "artist_id",
+            "cover_image",
+            "release_date",
+            "album_url",
+            "genres",
+            "duration_seconds",
+        ],
+        to_records(
+            data.assign(artist_id=data["Artist"].map(artist_ids)),
+            [
+                "Release",
+                "artist_id",
+                "Ground Truth",
+                "Released",
+                "AlbumURL",
+                "Genres",
+                "DurationSeconds",
+            ],
+        ),
+        conflict="title",
+    )
+
 
 async def import_albums(app: FastAPI, csv_file: str) -> None:
     """
     Import album data from a CSV file into the PostgreSQL database.
 
+    The file is read CHUNK_SIZE rows at a time, and all chunks are imported in a
+    single transaction, so a failed import leaves the database unchanged.
+
     Parameters:
     - app (FastAPI): The FastAPI application instance with the database pool.
     - csv_file (str): Path to the CSV file containing album data.
@@ -32,86 +343,129 @@ async def import_albums(app: FastAPI, csv_file: str) -> None:
     - None
 
     Raises:
-    - ValueError: If there is an error reading the CSV file.
+    - CSVValidationError: If there is an error reading or validating the CSV file.
     - RuntimeError: If there is an error importing the data into the database.
     """
     logger.info("Starting import from %s", csv_file)
 
     try:
-        data = pd.read_csv(csv_file)
-        logger.debug("CSV file %s loaded successfully", csv_file)
+        chunks = pd.read_csv(
+            csv_file,
+            usecols=lambda column: column in ALBUM_COLUMNS,
+            dtype=ALBUM_COLUMNS,
+            chunksize=CHUNK_SIZE,
+        )
     except Exception as e:
         logger.error("Error reading CSV file: %s", e)
-        raise ValueError(f"Error reading CSV file: {e}") from e
-
-    # Handle the 'Released' column by adding a default day
-    if "Released" in data.columns:
-
-        def parse_released(date_str):
-            try:
-                # Append '-01' to make it 'YYYY-MM-01'
-                return datetime.strptime(date_str, "%Y-%m").date()
-            except ValueError as ve:
-                logger.error("Error parsing date '%s': %s", date_str, ve)
-                raise ve
-
-        data["Released"] = data["Released"].apply(parse_released)
-    else:
-        logger.error("'Released' column is missing in the CSV.")
-        raise ValueError("'Released' column is missing in the CSV.")
+        raise CSVValidationError(f"Error reading CSV file: {e}") from e
 
     # Insert data into the database
+    total = inserted = 0
     try:
         async with app.state.pool.acquire() as connection:
             async with connection.transaction():
-                for _, row in data.iterrows():
-                    # Insert artist
-                    artist_id = await connection.fetchval(
-                        """
-                        INSERT INTO artists (name)
-                        VALUES ($1)
-                        ON CONFLICT (name) DO NOTHING
-                        RETURNING id;
-                        """,
-                        row["Artist"],
-                    )
-
-                    if artist_id is None:
-                        artist_id = await connection.fetchval(
-                            "SELECT id FROM artists WHERE name = $1", row["Artist"]
-                        )
-
-                    # Insert album
-                    await connection.execute(
-                        """
-                        INSERT INTO albums (title, artist_id, cover_image, release_date, album_url, genres, duration_seconds)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7)
-                        ON CONFLICT (title) DO NOTHING;
-                        """,
-                        row["Release"],
-                        artist_id,
-                        row["Ground Truth"],
-                        row["Released"],
-                        row["AlbumURL"],
-                        row["Genres"],
-                        row["DurationSeconds"],
-                    )
-                    logger.debug(
-                        "Inserted album '%s' by artist '%s'",
-                        row["Release"],
-                        row["Artist"],
-                    )
-        logger.info("Import completed successfully")
+                await disable_synchronous_commit(connection)
+                async with aclosing(read_chunks(chunks, clean_albums)) as cleaned:
+                    async for data in cleaned:
+                        inserted += await insert_albums(connection, data)
+                        total += len(data)
+                        logger.debug("Imported %d albums so far", total)
+        logger.info(
+            "Import completed successfully: %d of %d albums inserted", inserted, total
+        )
 
+    except CSVValidationError as e:
+        # Malformed CSV data, raised while reading or cleaning a chunk
+        logger.error("Error reading CSV file: %s", e)
+        raise
     except Exception as e:
         logger.error("Error importing data: %s", e)
         raise RuntimeError(f"Error importing data: {e}") from e
 
 
+def clean_songs(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Validate and convert a chunk of song rows read from a CSV file.
+
+    Parameters:
+    - data (pd.DataFrame): The song rows.
+
+    Returns:
+    - pd.DataFrame: The rows, with 'Explicit' converted to True, False or None and
+        duplicate songs dropped.
+
+    Raises:
+    - CSVValidationError: If a required column is missing.
+    """
+    # Validate required columns
+    missing = SONG_COLUMNS.keys() - set(data.columns)
+    if missing:
+        logger.error("Missing columns in CSV: %s", missing)
+        raise CSVValidationError(f"Missing columns in CSV: {missing}")
+
+    # Clean and convert the 'Explicit' column
+    explicit = data["Explicit"].str.strip().str.lower()
+    unknown = explicit[explicit.notna() & ~explicit.isin(EXPLICIT_VALUES)]
+    if not unknown.empty:
+        logger.warning(
+            "Unrecognized values for 'Explicit': %s. Setting to NULL.",
+            unknown.unique().tolist(),
+        )
+    # Missing and unrecognized values become NA, which is sent as NULL
+    data["Explicit"] = explicit.map(EXPLICIT_VALUES).astype("boolean")
+    return drop_duplicates(data, ["AlbumTitle", "SongTitle"])
+
+
+async def insert_songs(connection: asyncpg.Connection, data: pd.DataFrame) -> tuple:
+    """
+    Insert a chunk of cleaned song rows into the tracks table.
+
+    Parameters:
+    - connection (asyncpg.Connection): The database connection, in a transaction.
+    - data (pd.DataFrame): The song rows, as returned by clean_songs().
+
+    Returns:
+    - tuple: The number of songs inserted, and the number skipped because their
+        album does not exist.
+    """
+    # Look up the ids of every referenced album at once
+    album_ids = dict(
+        await connection.fetch(
+            "SELECT title, id FROM albums WHERE title = ANY($1::text[])",
+            data["AlbumTitle"].dropna().unique().tolist(),
+        )
+    )
+    data = data.assign(album_id=data["AlbumTitle"].map(album_ids))
+
+    # Skip songs with non-existent albums
+    missing = data["album_id"].isna()
+    skipped = int(missing.sum())
+    if skipped:
+        logger.warning(
+            "Albums not found. Skipping %d songs from: %s",
+            skipped,
+            data.loc[missing, "AlbumTitle"].unique().tolist(),
+        )
+        data = data[~missing].astype({"album_id": "int64"})
+
+    # Insert songs into tracks table
+    inserted = await copy_insert(
+        connection,
+        "tracks",
+        ["album_id", "title", "duration_seconds", "explicit"],
+        to_records(data, ["album_id", "SongTitle", "DurationSeconds", "Explicit"]),
+        conflict="title, album_id",
+    )
+    return inserted, skipped
+
+
 async def import_songs(app: FastAPI, csv_file: str) -> None:
     """
     Import song data from a CSV file into the PostgreSQL database.
 
+    The file is read CHUNK_SIZE rows at a time, and all chunks are imported in a
+    single transaction, so a failed import leaves the database unchanged.
+
     Parameters:
     - app (FastAPI): The FastAPI application instance with the database pool.
     - csv_file (str): Path to the CSV file containing song data.
@@ -120,83 +474,45 @@ async def import_songs(app: FastAPI, csv_file: str) -> None:
     - None
 
     Raises:
-    - ValueError: If there is an error reading the CSV file.
+    - CSVValidationError: If there is an error reading or validating the CSV file.
     - RuntimeError: If there is an error importing the data into the database.
     """
     logger.info("Starting import from %s", csv_file)
 
     try:
-        data = pd.read_csv(csv_file)
-        logger.debug("CSV file %s loaded successfully", csv_file)
+        chunks = pd.read_csv(
+            csv_file,
+            usecols=lambda column: column in SONG_COLUMNS,
+            dtype=SONG_COLUMNS,
+            chunksize=CHUNK_SIZE,
+        )
     except Exception as e:
         logger.error("Error reading CSV file: %s", e)
-        raise ValueError(f"Error reading CSV file: {e}") from e
-
-    # Validate required columns
-    required_columns = {"AlbumTitle", "SongTitle", "DurationSeconds", "Explicit"}
-    if not required_columns.issubset(data.columns):
-        missing = required_columns - set(data.columns)
-        logger.error("Missing columns in CSV: %s", missing)
-        raise ValueError(f"Missing columns in CSV: {missing}")
-
-    # Clean and convert the 'Explicit' column
-    def clean_explicit(value):
-        if pd.isna(value):
-            return None
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, str):
-            value_lower = value.strip().lower()
-            if value_lower in {"true", "t", "yes", "1"}:
-                return True
-            elif value_lower in {"false", "f", "no", "0"}:
-                return False
-            elif value_lower == "none" or value_lower == "":
-                return None
-        # If value is not recognizable, log and set to None
-        logger.warning("Unrecognized value for 'Explicit': %s. Setting to NULL.", value)
-        return None
-
-    data["Explicit"] = data["Explicit"].apply(clean_explicit)
+        raise CSVValidationError(f"Error reading CSV file: {e}") from e
 
     # Insert data into the database
+    inserted = skipped = 0
     try:
         async with app.state.pool.acquire() as connection:
             async with connection.transaction():
-                for _, row in data.iterrows():
-                    # Fetch album ID based on AlbumTitle
-                    album_id = await connection.fetchval(
-                        "SELECT id FROM albums WHERE title = $1",
-                        row["AlbumTitle"],
-                    )
-
-                    if album_id is None:
-                        logger.warning(
-                            "Album '%s' not found. Skipping song '%s'.",
-                            row["AlbumTitle"],
-                            row["SongTitle"],
+                await disable_synchronous_commit(connection)
+                async with aclosing(read_chunks(chunks, clean_songs)) as cleaned:
+                    async for data in cleaned:
+                        chunk_inserted, chunk_skipped = await insert_songs(
+                            connection, data
                         )
-                        continue  # Skip songs with non-existent albums
-
-                    # Insert song into tracks table
-                    await connection.execute(
-                        """
-                        INSERT INTO tracks (album_id, title, duration_seconds, explicit)
-                        VALUES ($1, $2, $3, $4)
-                        ON CONFLICT (title, album_id) DO NOTHING;
-                        """,
-                        album_id,
-                        row["SongTitle"],
-                        row["DurationSeconds"],
-                        row["Explicit"],
-                    )
-                    logger.debug(
-                        "Inserted song '%s' into album '%s'",
-                        row["SongTitle"],
-                        row["AlbumTitle"],
-                    )
-        logger.info("Song import completed successfully")
+                        inserted += chunk_inserted
+                        skipped += chunk_skipped
+        logger.info(
+            "Song import completed successfully: %d songs inserted, %d skipped",
+            inserted,
+            skipped,
+        )
 
+    except CSVValidationError as e:
+        # Malformed CSV data, raised while reading or cleaning a chunk
+        logger.error("Error reading CSV file: %s", e)
+        raise
     except Exception as e:
         logger.error("Error importing songs: %s", e)
         raise RuntimeError(f"Error importing songs: {e}") from e
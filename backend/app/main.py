@@ -7,6 +7,7 @@ Each route has /api as a prefix, so the full path to the route is /api/{route}.
 import io
 import os
 import logging
+import logging.config
 import traceback
 from typing import AsyncGenerator, Optional
 from dotenv import load_dotenv
@@ -19,16 +20,29 @@ from PIL import Image
 from pgvector.asyncpg import register_vector
 
 from app.metadata_orchestrator import MetadataOrchestrator
+from app.collectors.http_session import close_session
 from app.import_csv import import_albums, import_songs
 from app.process.utils import validate_image, get_image
 from app.process.cover_extractor import extract_album_cover, bg_removal
 from app.process.logic import vectorize_image, match_vector
 
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging once for the whole application
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+logging.config.dictConfig(
+    {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "default": {"format": "%(levelname)s:%(name)s:%(message)s"},
+        },
+        "handlers": {
+            "console": {"class": "logging.StreamHandler", "formatter": "default"},
+        },
+        "root": {"level": LOG_LEVEL, "handlers": ["console"]},
+    }
+)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 logger.info("Initializing backend")
 
 def determine_device(): 
@@ -85,6 +99,7 @@ async def lifespan(application: FastAPI) -> AsyncGenerator:
     application.state.pool = pool
     yield  # Yield control to the application
     await application.state.pool.close()
+    await close_session()  # Shared collector HTTP session
 
 
 # Initialize app and router
@@ -158,7 +173,8 @@ async def upload_image(image: UploadFile = File(...)) -> dict:
                 status_code=500,
                 detail="Failed to vectorize the image or invalid vector size.",
             )
-        logger.debug("Image vector: %s", image_vector)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Image vector: %s", image_vector)
 
         # Step 4: Query the database for similar records
         async with app.state.pool.acquire() as connection:
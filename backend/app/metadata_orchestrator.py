@@ -15,9 +15,7 @@ class MetadataOrchestrator:
     """
 
     def __init__(self):
-        logging.basicConfig(level=logging.DEBUG)
         self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logging.DEBUG)
 
         self.collectors = [
             SpotifyCollector("spotify"),
@@ -55,9 +53,12 @@ class MetadataOrchestrator:
                 "Collecting metadata using %s", collector.__class__.__name__
             )
             source_metadata = await collector.fetch_metadata(query)
-            self.logger.debug(
-                "Metadata from %s: %s", collector.__class__.__name__, source_metadata
-            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Metadata from %s: %s",
+                    collector.__class__.__name__,
+                    source_metadata,
+                )
             if source_metadata and "error" not in source_metadata:
                 metadata[collector.get_name()] = source_metadata
                 self.logger.info(
@@ -12,9 +12,8 @@ import cv2
 from PIL import Image
 from rembg import remove
 
-# Configure logging
+# Logging is configured once by the application entrypoint
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 # Define the debugging images directory with absolute path
 DEBUGGING_DIR = os.path.abspath("debugging_imgs")
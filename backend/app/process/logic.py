@@ -116,7 +116,8 @@ async def match_vector(image_vector: List[float], n: int, connection) -> List[Di
             matched_records.append(matched_record)
 
         logger.debug("Found %d similar albums.", len(matched_records))
-        logger.debug("Similar albums: %s", matched_records)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Similar albums: %s", matched_records)
         return matched_records
 
     except Exception as e:
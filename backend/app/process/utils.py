@@ -13,9 +13,8 @@ from fastapi import HTTPException, UploadFile
 load_dotenv()
 MEDIA_DIR = os.getenv("MEDIA_DIR")
 
-logging.basicConfig(level=logging.DEBUG)
+# Logging is configured once by the application entrypoint
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 logger.info("Initializing utils module")
 
 